@@ -1,19 +1,54 @@
+import io
+import shutil
+import tempfile
+
+MAX_WRITE_BUFFER = 1 << 20 # Upper bound for the output file buffer, so huge sources don't reserve huge buffers
+
 # Emitter object keeps track of the generated code and outputs it
 class Emitter:
-  def __init__(self, fullPath: str):
+  __slots__ = ('fullPath', 'bufferSize', 'header', 'code')
+
+  def __init__(self, fullPath: str, sizeHint: int = 0) -> None:
+    self.fullPath = fullPath
+    # I/O buffer size picked from the estimated output size (sizeHint, in characters)
+    # Many small emits are batched by the temporary file's buffer, and writeFile copies the code in chunks of this size
+    self.bufferSize = min(max(sizeHint, io.DEFAULT_BUFFER_SIZE), MAX_WRITE_BUFFER)
+    self.header = io.StringIO() # Declarations arrive while code is being emitted, so the header is kept in memory
+    self.code = tempfile.TemporaryFile('w+', buffering=self.bufferSize) # Code is streamed out instead of held in memory
+
+  # Start emitting a new output file, reusing the existing buffers
+  # The temporary file keeps the buffer it was opened with, so the size hint here only applies to the final copy in writeFile
+  def reset(self, fullPath: str, sizeHint: int = 0) -> None:
     self.fullPath = fullPath
-    self.header = ""
-    self.code = ""
+    self.bufferSize = min(max(sizeHint, io.DEFAULT_BUFFER_SIZE), MAX_WRITE_BUFFER)
+    self.header.seek(0)
+    self.header.truncate()
+    self.code.seek(0)
+    self.code.truncate()
 
-  def emit(self, code: str):
-    self.code += code
+  def emit(self, code: str) -> None:
+    self.code.write(code)
 
-  def emitLine(self, code: str):
-    self.code += code + '\n'
+  def emitLine(self, code: str) -> None:
+    self.code.write(code)
+    self.code.write('\n')
   
-  def headerLine(self, code: str):
-    self.header += code + '\n'
+  def headerLine(self, code: str) -> None:
+    self.header.write(code)
+    self.header.write('\n')
+
+  def writeFile(self) -> None:
+    with open(self.fullPath, 'w', buffering=self.bufferSize) as outputFile:
+      outputFile.write(self.header.getvalue())
+      self.code.seek(0)
+      shutil.copyfileobj(self.code, outputFile, self.bufferSize)
+
+  # Close the temporary file holding the code
+  def close(self) -> None:
+    self.code.close()
+
+  def __enter__(self) -> "Emitter":
+    return self
 
-  def writeFile(self):
-    with open(self.fullPath, 'w') as outputFile:
-      outputFile.write(self.header + self.code)
\ No newline at end of file
+  def __exit__(self, *excInfo: object) -> None:
+    self.close()
\ No newline at end of file
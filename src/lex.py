@@ -1,15 +1,22 @@
 import enum
 import sys
+from typing import NoReturn, Optional
 
 class Lexer:
-  def __init__(self, source: str):
+  __slots__ = ('source', 'curChar', 'curPos')
+
+  def __init__(self, source: str) -> None:
+    self.reset(source)
+
+  # Start lexing a new source, so one lexer can be reused across compilations
+  def reset(self, source: str) -> None:
     self.source = source + '\n' # Source code to lex as a string. Append a newline to simplify lexing/parsing the last token/statement
     self.curChar = '' # Curernt character in the string
     self.curPos = -1 # Current position in the string
     self.nextChar()
 
   # Procees the next character
-  def nextChar(self):
+  def nextChar(self) -> None:
     self.curPos += 1
     if self.curPos >= len(self.source):
       self.curChar = '\0' # EOF
@@ -17,32 +24,31 @@ class Lexer:
       self.curChar = self.source[self.curPos]
 
   # Return the lookahead character
-  def peek(self):
+  def peek(self) -> str:
     if self.curPos + 1 >= len(self.source):
       return '\0'
     else:
       return self.source[self.curPos+1]
 
   # Invalid token found, print error message and exit
-  def abort(self, message: str):
+  def abort(self, message: str) -> NoReturn:
     sys.exit("Lexing error. " + message)
 
   # Skip whitespace except newlines, which we will use to indicate the end of a statement
-  def skipWhiteSpaces(self):
+  def skipWhiteSpaces(self) -> None:
     while self.curChar == ' ' or self.curChar == '\t' or self.curChar == '\r':
       self.nextChar()
 
   # Skip comments in the code
-  def skipComment(self):
+  def skipComment(self) -> None:
     if self.curChar == '#':
       while self.curChar != '\n':
         self.nextChar()
 
   # Return the next token
-  def getToken(self):
+  def getToken(self) -> "Token":
     self.skipWhiteSpaces()
     self.skipComment()
-    token = None
 
     # Check the first character of this token to see if we can decide what it is
     # If it is a multiple character operator (e.g., !=), number, identifier, or keyword then we will process the rest
@@ -146,7 +152,7 @@ class Lexer:
     self.nextChar()
     return token
 
-class TokenType(enum.Enum):
+class TokenType(enum.IntEnum):
   EOF = -1
   NEWLINE = 0
   NUMBER = 1
@@ -187,12 +193,14 @@ class TokenType(enum.Enum):
   GTEQ = 211
 
 class Token:
-  def __init__(self, tokenText: str, tokenKind: TokenType):
+  __slots__ = ('text', 'kind')
+
+  def __init__(self, tokenText: str, tokenKind: TokenType) -> None:
     self.text = tokenText
     self.kind = tokenKind
 
   @staticmethod
-  def checkIfKeyword(tokenText):
+  def checkIfKeyword(tokenText: str) -> Optional["TokenType"]:
     for kind in TokenType:
       # Relies on all keyword enum values being 1XX
       if kind.name == tokenText and kind.value >= 100 and kind.value < 200:
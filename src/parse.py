@@ -1,282 +1,282 @@
 import sys
+from typing import Callable, Dict, NoReturn, Set
 from lex import TokenType, Token, Lexer
 from emit import Emitter
 
+# Operator groups, checked with a single set lookup instead of chained comparisons
+COMPARISON_OPERATORS = frozenset({TokenType.GT, TokenType.GTEQ, TokenType.LT, TokenType.LTEQ, TokenType.EQEQ, TokenType.NOTEQ})
+ADDITIVE_OPERATORS = frozenset({TokenType.PLUS, TokenType.MINUS})
+MULTIPLICATIVE_OPERATORS = frozenset({TokenType.ASTERISK, TokenType.SLASH})
+IF_BRANCH_ENDS = frozenset({TokenType.ELSEIF, TokenType.ELSE, TokenType.ENDIF})
+
 # Parser object keeps track of current token and checks if the code matches the grammar
 class Parser:
-  def __init__(self, lexer: Lexer, emitter: Emitter):
+  __slots__ = ('lexer', 'emitter', 'symbols', 'labelsDeclared', 'labelsGotoed', 'statementHandlers', 'curToken', 'peekToken')
+
+  def __init__(self, lexer: Lexer, emitter: Emitter) -> None:
+    self.symbols: Set[str] = set() # Variables declared so far
+    self.labelsDeclared: Set[str] = set() # Labels declared so far
+    self.labelsGotoed: Set[str] = set() # Labels goto'ed so far
+
+    # Statement handlers keyed by the token that starts the statement
+    self.statementHandlers: Dict[TokenType, Callable[[], None]] = {
+      TokenType.PRINT: self.printStatement,
+      TokenType.IF: self.ifStatement,
+      TokenType.WHILE: self.whileStatement,
+      TokenType.LABEL: self.labelStatement,
+      TokenType.GOTO: self.gotoStatement,
+      TokenType.INT: self.intStatement,
+      TokenType.FLT: self.fltStatement,
+      TokenType.STR: self.strStatement,
+      TokenType.INPUT: self.inputStatement,
+      TokenType.ARRAYSTART: self.arrayStatement,
+    }
+
+    self.reset(lexer, emitter)
+
+  # Start parsing with a new lexer and emitter, so one parser can be reused across compilations
+  def reset(self, lexer: Lexer, emitter: Emitter) -> None:
     self.lexer = lexer
     self.emitter = emitter
 
-    self.symbols = set() # Variables declared so far
-    self.labelsDeclared = set() # Labels declared so far
-    self.labelsGotoed = set() # Labels goto'ed so far
+    self.symbols.clear()
+    self.labelsDeclared.clear()
+    self.labelsGotoed.clear()
 
-    self.curToken: Token = None
-    self.peekToken: Token = None
-    self.nextToken()
-    self.nextToken() #  Call this twice to initialize current and peek
+    # Initialize current and peek
+    self.curToken: Token = lexer.getToken()
+    self.peekToken: Token = lexer.getToken()
 
   # Return true if the current token matches
-  def checkToken(self, kind: TokenType):
+  # Hot paths compare self.curToken.kind directly with `is` instead, TokenType members are singletons
+  def checkToken(self, kind: TokenType) -> bool:
     return kind == self.curToken.kind
 
   # Return true if the next token matches
-  def checkPeek(self, kind: TokenType):
+  def checkPeek(self, kind: TokenType) -> bool:
     return kind == self.peekToken.kind
 
   # Try to match current token. If not, error. Advances the current token.
-  def match(self, kind: TokenType):
+  def match(self, kind: TokenType) -> None:
     if not self.checkToken(kind):
       self.abort("Expected: " + kind.name + ", got " + self.curToken.kind.name)
     self.nextToken()
 
   # Advances the current token
-  def nextToken(self):
+  def nextToken(self) -> None:
     self.curToken = self.peekToken
     self.peekToken = self.lexer.getToken()
     # No need to worry about passing the EOF, lexer handles that
 
-  def abort(self, message):
+  def abort(self, message: str) -> NoReturn:
     sys.exit("Error: " + message)
 
   # Production rules
 
   # program ::= {statement}
-  def program(self):
+  def program(self) -> None:
     self.emitter.headerLine("#include <stdio.h>")
     self.emitter.headerLine("int main(void){")
 
     # Since some newlines are required in our grammaer, need to skip the excess
-    while self.checkToken(TokenType.NEWLINE):
-      self.nextToken()
+    self.skipNewlines(False)
+
+    # Bind the method called in the loop below once
+    statement = self.statement
 
     # Parse all the statements in the program
-    while not self.checkToken(TokenType.EOF):
-      self.statement()
+    while self.curToken.kind is not TokenType.EOF:
+      statement()
 
     # Wrap things up
-    self.emitter.emitLine("return 0;")
-    self.emitter.emitLine("}")
+    self.emitter.emitLine("return 0;\n}")
 
     # Check that each label referenced in a GOTO is declared
-    for label in self.labelsGotoed:
-      if label not in self.labelsDeclared:
-        self.abort("Attempting to GOTO to undeclared label: " + label)
-
-  def ifElseStatement(self):
-    if self.checkToken(TokenType.ELSEIF):
-      self.nextToken()
-      self.emitter.emit("}else if(")
-      self.comparison()
-
-      self.match(TokenType.THEN)
-      self.nl()
-      self.emitter.emitLine("){")
-
-      # Zero or more statements in the body
-      while not self.checkToken(TokenType.ENDIF):
-        self.statement()
-
-      self.match(TokenType.ENDIF)
-
-      if (self.peekToken.kind != TokenType.ELSEIF and self.peekToken.kind != TokenType.ELSE):
-        self.emitter.emitLine("}")
-
-    return self.peekToken.kind == TokenType.ELSEIF
+    undeclared = self.labelsGotoed - self.labelsDeclared
+    if undeclared:
+      plural = "s" if len(undeclared) > 1 else ""
+      self.abort(f"Attempting to GOTO to undeclared label{plural}: " + ", ".join(sorted(undeclared)))
+
+  # Declare a variable in the header the first time it is seen
+  def declareSymbol(self, name: str, ctype: str) -> None:
+    # Compare sizes around add() so the set is only probed once
+    count = len(self.symbols)
+    self.symbols.add(name)
+    if len(self.symbols) != count:
+      self.emitter.headerLine(f"{ctype} {name};")
 
   # One of the following statements ...
-  def statement(self):
+  def statement(self) -> None:
     # Check the first token to see what kind of statement this is
+    handler = self.statementHandlers.get(self.curToken.kind)
+    if handler is None:
+      # This is not a valid statement. Error.
+      self.abort("Invalid statement at " + self.curToken.text + " (" + self.curToken.kind.name + ")")
+    handler()
 
-    # "PRINT" (expression | string)
-    if self.checkToken(TokenType.PRINT):
-      self.nextToken()
-
-      if self.checkToken(TokenType.STRING):
-        # Simple string, so print it
-        self.emitter.emitLine("printf(\"" + self.curToken.text + "\\n\");")
-        self.nextToken()
-      else:
-        # Expect expression and print the result as a float
-        self.emitter.emit("printf(\"%" + ".2f\\n\", (float)(")
-        self.expression()
-        self.emitter.emitLine("));")
-
-    elif self.checkToken(TokenType.IF):
-      self.nextToken()
-      self.emitter.emit("if(")
-      self.comparison()
-
-      self.match(TokenType.THEN)
-      self.nl()
-      self.emitter.emitLine("){")
-
-      # Zero or more statements in the body
-      while not self.checkToken(TokenType.ENDIF):
-        self.statement()
-
-      self.match(TokenType.ENDIF)
-
-      if (self.peekToken.kind != TokenType.ELSEIF and self.peekToken.kind != TokenType.ELSE):
-        self.emitter.emitLine("}")
-      else:
-        self.nextToken()
-        while(self.ifElseStatement()):
-          self.nextToken()
+    # Newline
+    self.skipNewlines(True)
 
-        self.nextToken()
-        if self.checkToken(TokenType.ELSE):
-          self.nextToken()
-          self.emitter.emit("}else")
+  # "PRINT" (expression | string)
+  def printStatement(self) -> None:
+    self.nextToken()
 
-          self.nl()
-          self.emitter.emitLine("{")
+    if self.curToken.kind is TokenType.STRING:
+      # Simple string, so print it
+      self.emitter.emitLine(f'printf("{self.curToken.text}\\n");')
+      self.nextToken()
+    else:
+      # Expect expression and print the result as a float
+      self.emitter.emit('printf("%.2f\\n", (float)(')
+      self.expression()
+      self.emitter.emitLine("));")
 
-          # Zero or more statements in the body
-          while not self.checkToken(TokenType.ENDIF):
-            self.statement()
+  # "IF" comparison "THEN" nl {statement} {"ELSEIF" comparison "THEN" nl {statement}} ["ELSE" nl {statement}] "ENDIF"
+  def ifStatement(self) -> None:
+    self.nextToken()
+    self.emitter.emit("if(")
+    self.comparison()
 
-          self.match(TokenType.ENDIF)
-          self.emitter.emitLine("}")
+    self.match(TokenType.THEN)
+    self.skipNewlines(True)
+    self.emitter.emitLine("){")
+    self.ifBranchBody()
 
-    elif self.checkToken(TokenType.WHILE):
+    # Zero or more else-if branches
+    while self.curToken.kind is TokenType.ELSEIF:
       self.nextToken()
-      self.emitter.emit("while(")
+      self.emitter.emit("}else if(")
       self.comparison()
 
-      self.match(TokenType.REPEAT)
-      self.nl()
+      self.match(TokenType.THEN)
+      self.skipNewlines(True)
       self.emitter.emitLine("){")
+      self.ifBranchBody()
 
-      # Zero or more statements in the loop body
-      while not self.checkToken(TokenType.ENDWHILE):
-        self.statement()
-
-      self.match(TokenType.ENDWHILE)
-      self.emitter.emitLine("}")
-      
-    # "LABEL" ident
-    elif self.checkToken(TokenType.LABEL):
+    # Optional else branch
+    if self.curToken.kind is TokenType.ELSE:
       self.nextToken()
+      self.emitter.emit("}else")
 
-      # Make sure this label doesn't already exist
-      if self.curToken.text in self.labelsDeclared:
-        self.abort("Label already exists: " + self.curToken.text)
-      self.labelsDeclared.add(self.curToken.text)
+      self.skipNewlines(True)
+      self.emitter.emitLine("{")
 
-      self.emitter.emitLine(self.curToken.text + ":")
-      self.match(TokenType.IDENT)
+      # Zero or more statements in the body
+      statement = self.statement
+      while self.curToken.kind is not TokenType.ENDIF:
+        statement()
 
-    # "GOTO" ident
-    elif self.checkToken(TokenType.GOTO):
-      self.nextToken()
-      self.labelsGotoed.add(self.curToken.text)
-      self.emitter.emitLine("goto " + self.curToken.text + ";")
-      self.match(TokenType.IDENT)
+    # A single ENDIF closes the whole chain
+    self.match(TokenType.ENDIF)
+    self.emitter.emitLine("}")
 
-    # "INT" ident "=" expression
-    elif self.checkToken(TokenType.INT):
-      self.nextToken()
+  # Zero or more statements in an IF/ELSEIF body, up to the next branch or ENDIF
+  def ifBranchBody(self) -> None:
+    statement = self.statement
+    while self.curToken.kind not in IF_BRANCH_ENDS:
+      statement()
 
-      if self.curToken.text not in self.symbols:
-        self.symbols.add(self.curToken.text)
-        self.emitter.headerLine("int " + self.curToken.text + ";")
+  # "WHILE" comparison "REPEAT" nl {statement} "ENDWHILE"
+  def whileStatement(self) -> None:
+    self.nextToken()
+    self.emitter.emit("while(")
+    self.comparison()
 
-      self.emitter.emit(self.curToken.text + " = ")
-      self.match(TokenType.IDENT)
-      self.match(TokenType.EQ)
+    self.match(TokenType.REPEAT)
+    self.skipNewlines(True)
+    self.emitter.emitLine("){")
 
-      self.expression()
-      self.emitter.emitLine(";")
+    # Zero or more statements in the loop body
+    statement = self.statement
+    while self.curToken.kind is not TokenType.ENDWHILE:
+      statement()
 
-    # "FLT" ident "=" expression
-    elif self.checkToken(TokenType.FLT):
-      self.nextToken()
+    self.match(TokenType.ENDWHILE)
+    self.emitter.emitLine("}")
 
-      if self.curToken.text not in self.symbols:
-        self.symbols.add(self.curToken.text)
-        self.emitter.headerLine("float " + self.curToken.text + ";")
+  # "LABEL" ident
+  def labelStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
 
-      self.emitter.emit(self.curToken.text + " = ")
-      self.match(TokenType.IDENT)
-      self.match(TokenType.EQ)
+    # Make sure this label doesn't already exist
+    if name in self.labelsDeclared:
+      self.abort("Label already exists: " + name)
+    self.labelsDeclared.add(name)
 
-      self.expression()
-      self.emitter.emitLine(";")
+    self.emitter.emitLine(f"{name}:")
+    self.match(TokenType.IDENT)
 
-    # "STR" ident "=" value
-    elif self.checkToken(TokenType.STR):
-      self.nextToken()
+  # "GOTO" ident
+  def gotoStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
+    self.labelsGotoed.add(name)
+    self.emitter.emitLine(f"goto {name};")
+    self.match(TokenType.IDENT)
 
-      if self.curToken.text not in self.symbols:
-        self.symbols.add(self.curToken.text)
-        self.emitter.headerLine("char " + self.curToken.text + ";")
+  # "INT" ident "=" expression
+  def intStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
 
-      self.emitter.emit(self.curToken.text + " = ")
-      self.match(TokenType.IDENT)
-      self.match(TokenType.EQ)
-      self.emitter.emit("\"" + self.curToken.text + "\"")
-      self.match(TokenType.STRING)
+    self.declareSymbol(name, "int")
 
-      self.emitter.emitLine(";")
+    self.emitter.emit(f"{name} = ")
+    self.match(TokenType.IDENT)
+    self.match(TokenType.EQ)
 
-    # "INPUT" ident
-    elif self.checkToken(TokenType.INPUT):
-      self.nextToken()
+    self.expression()
+    self.emitter.emitLine(";")
 
-      # If variable doesn't already exist, declare it
-      if self.curToken.text not in self.symbols:
-        self.symbols.add(self.curToken.text)
-        self.emitter.headerLine("float " + self.curToken.text + ";")
+  # "FLT" ident "=" expression
+  def fltStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
 
-      # Emit scanf but also validate the input. If invalid, set the variable to 0 and clear the input
-      self.emitter.emitLine("if(0 == scanf(\"%" + "f\", &" + self.curToken.text + ")) {")
-      self.emitter.emitLine(self.curToken.text + " = 0;")
-      self.emitter.emit("scanf(\"%")
-      self.emitter.emitLine("*s\");")
-      self.emitter.emitLine("}")
-      self.match(TokenType.IDENT)
+    self.declareSymbol(name, "float")
 
-    elif self.checkToken(TokenType.ARRAYSTART):
-      if self.curToken.text not in self.symbols:
-        self.symbols.add(self.curToken.text)
-        self.emitter.headerLine("char " + self.curToken.text + ";")
+    self.emitter.emit(f"{name} = ")
+    self.match(TokenType.IDENT)
+    self.match(TokenType.EQ)
 
-      arrayContent = str()
-      arrayLength = 0
+    self.expression()
+    self.emitter.emitLine(";")
 
-      if self.peekToken == TokenType.NUMBER:
-        self.emitter.emit("float ")
-      elif self.peekToken == TokenType.STRING:
-        self.emitter.emit("char ")
+  # "STR" ident "=" value
+  def strStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
 
-      while self.curToken != TokenType.ARRAYEND:
-        if self.curToken == TokenType.NUMBER or self.curToken == TokenType.STRING:
-          arrayContent += self.curToken.text
-          arrayLength += 1
-        else:
-          self.abort("Illegal character in an array " + self.curToken.text + ". Only numbers and strings are allowed.")
+    self.declareSymbol(name, "char")
 
-        if self.peekToken != TokenType.ARRAYEND:
-          arrayContent += ", "
+    self.match(TokenType.IDENT)
+    self.match(TokenType.EQ)
+    value = self.curToken.text
+    self.match(TokenType.STRING)
 
-        self.nextToken()
+    # The whole assignment is known at this point, so emit it in one go
+    self.emitter.emitLine(f'{name} = "{value}";')
 
-      self.emitter.emit("[" + str(arrayLength) + "]")
+  # "INPUT" ident
+  def inputStatement(self) -> None:
+    self.nextToken()
+    name = self.curToken.text
 
-      if arrayContent > 0:
-        self.emitter.emit(" = {" + arrayContent + "};")
+    # If variable doesn't already exist, declare it
+    self.declareSymbol(name, "float")
 
-    # This is not a valid statement. Error.
-    else:
-      self.abort("Invalid statement at " + self.curToken.text + " (" + self.curToken.kind.name + ")")
-    
-    # Newline
-    self.nl()
+    # Emit scanf but also validate the input. If invalid, set the variable to 0 and clear the input
+    self.emitter.emitLine(f'if(0 == scanf("%f", &{name})) {{\n{name} = 0;\nscanf("%*s");\n}}')
+    self.match(TokenType.IDENT)
+
+  # "[" {value} "]"
+  # Arrays have no grammar for naming the variable yet, so there is no valid C to emit for them
+  def arrayStatement(self) -> None:
+    self.abort("Arrays are not supported yet")
 
   # comparison ::= expression (("==" | "!=" | ">" | ">=" | "<" | "<=") expression)+
-  def comparison(self):
+  def comparison(self) -> None:
     self.expression()
     # Must be at least comparison operator and another expression
     if self.isComparisonOperator():
@@ -290,61 +290,63 @@ class Parser:
       self.expression()
 
     # Can have 0 or more +/- and expressions
-    while self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
+    while self.curToken.kind in ADDITIVE_OPERATORS:
       self.emitter.emit(self.curToken.text)
       self.nextToken()
       self.expression()
     
   # Return true if the current token is a comparison operator
-  def isComparisonOperator(self):
-    return self.checkToken(TokenType.GT) or self.checkToken(TokenType.GTEQ) or self.checkToken(TokenType.LT) or self.checkToken(TokenType.LTEQ) or self.checkToken(TokenType.EQEQ) or self.checkToken(TokenType.NOTEQ)
+  def isComparisonOperator(self) -> bool:
+    return self.curToken.kind in COMPARISON_OPERATORS
 
   # expression ::= term {( "-" | "+" ) term}
-  def expression(self):
+  def expression(self) -> None:
     self.term()
     # Can have 0 or more +/- and expressions
-    while self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
+    while self.curToken.kind in ADDITIVE_OPERATORS:
       self.emitter.emit(self.curToken.text)
       self.nextToken()
       self.term()
 
   # term ::= unary {( "/" | "*" ) unary}
-  def term(self):
+  def term(self) -> None:
     self.unary()
     # Can have 0 or more *// and expressions.
-    while self.checkToken(TokenType.ASTERISK) or self.checkToken(TokenType.SLASH):
+    while self.curToken.kind in MULTIPLICATIVE_OPERATORS:
       self.emitter.emit(self.curToken.text)
       self.nextToken()
       self.unary()
 
   # unary ::= ["+" | "-"] primary
-  def unary(self):
+  def unary(self) -> None:
     # Optional unary +/-
-    if self.checkToken(TokenType.PLUS) or self.checkToken(TokenType.MINUS):
+    if self.curToken.kind in ADDITIVE_OPERATORS:
         self.emitter.emit(self.curToken.text)
         self.nextToken()        
     self.primary()
 
   # primary ::= number | ident
-  def primary(self):
-    if self.checkToken(TokenType.NUMBER):
+  def primary(self) -> None:
+    if self.curToken.kind is TokenType.NUMBER:
       self.emitter.emit(self.curToken.text)
       self.nextToken()
-    elif self.checkToken(TokenType.IDENT):
+    elif self.curToken.kind is TokenType.IDENT:
       # Ensure the variable already exists
-      if self.curToken.text not in self.symbols:
-        self.abort("Referencing variable before assignment: " + self.curToken.text)
+      name = self.curToken.text
+      if name not in self.symbols:
+        self.abort("Referencing variable before assignment: " + name)
 
-      self.emitter.emit(self.curToken.text)
+      self.emitter.emit(name)
       self.nextToken()
     else:
       # Error
       self.abort("Unexpected token at " + self.curToken.text)
 
   # nl ::= '\n'+
-  def nl(self):
-    # Require at least one newline
-    self.match(TokenType.NEWLINE)
-    # But we will allow extra newlines too
-    while self.checkToken(TokenType.NEWLINE):
-      self.nextToken()
\ No newline at end of file
+  # Skip a run of newlines, requiring at least one where the grammar does
+  def skipNewlines(self, required: bool) -> None:
+    if required and self.curToken.kind is not TokenType.NEWLINE:
+      self.abort("Expected: " + TokenType.NEWLINE.name + ", got " + self.curToken.kind.name)
+    nextToken = self.nextToken
+    while self.curToken.kind is TokenType.NEWLINE:
+      nextToken()
\ No newline at end of file
@@ -0,0 +1,10 @@
+# Compiles the lexer, emitter and parser into C extensions with mypyc
+# Build in place with: python3 setup.py build_ext --inplace
+# teenytiny.py imports the compiled modules unchanged, delete the generated .so files to go back to pure Python
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+  name="teenytiny",
+  ext_modules=mypycify(["lex.py", "emit.py", "parse.py"]),
+)
\ No newline at end of file
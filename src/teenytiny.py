@@ -13,11 +13,11 @@ def main():
 
   # Initialize the lexer and parser
   lexer = Lexer(source)
-  emitter = Emitter("out.c")
-  praser = Parser(lexer, emitter)
+  with Emitter("out.c", len(source) * 5) as emitter: # Generated C is usually a few times larger than the source
+    praser = Parser(lexer, emitter)
 
-  praser.program() # Start the parser
-  emitter.writeFile() # Write the output to a file
+    praser.program() # Start the parser
+    emitter.writeFile() # Write the output to a file
   print("Compiling completed")
 
 main()
\ No newline at end of file